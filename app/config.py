@@ -4,6 +4,9 @@ import os
 # Define base directory of the application
 basedir = os.path.abspath(os.path.dirname(__file__))
 
+# Reject oversized uploads before the body is read (bytes, default 50MB)
+MAX_CONTENT_LENGTH = int(os.environ.get('MAX_CONTENT_LENGTH', 50 * 1024 * 1024))
+
 # Configuration settings
 class Config:
     # Secret key for protecting sessions
@@ -0,0 +1,84 @@
+# Edge-side image normalization before forwarding uploads to the ML service
+from PIL import Image, UnidentifiedImageError
+
+# Formats accepted after inspecting the image header (not just the extension)
+ALLOWED_FORMATS = {'PNG', 'JPEG', 'BMP', 'TIFF'}
+
+# Refuse decompression bombs before any pixel data is decoded. Uses Pillow's
+# own limit, so images Pillow would warn about are rejected here; Pillow
+# raises DecompressionBombError itself above twice this size.
+MAX_IMAGE_PIXELS = Image.MAX_IMAGE_PIXELS
+
+# Modes that convert('L') maps to 8-bit grayscale without losing range
+EIGHT_BIT_MODES = {'L', 'RGB', 'RGBA', 'P', 'LA', 'CMYK', 'YCbCr', '1'}
+
+
+class InvalidImageError(ValueError):
+    """Raised when an upload is not a readable image in an allowed format"""
+
+
+def normalize_image(stream, working_resolution):
+    """
+    Validate the image header, downsample to fit within working_resolution
+    and convert to 8-bit grayscale.
+
+    Returns (pixels, width, height) where pixels is the raw uint8 buffer.
+    """
+    try:
+        img = Image.open(stream)
+    except Image.DecompressionBombError:
+        raise InvalidImageError('Image dimensions are out of range')
+    except (UnidentifiedImageError, OSError):
+        raise InvalidImageError('File is not a readable image')
+
+    if img.format not in ALLOWED_FORMATS:
+        raise InvalidImageError(f'Unsupported image format: {img.format}')
+
+    width, height = img.size
+    if width <= 0 or height <= 0 or width * height > MAX_IMAGE_PIXELS:
+        raise InvalidImageError('Image dimensions are out of range')
+
+    target = (working_resolution, working_resolution)
+    try:
+        # Let JPEG decode directly at a reduced scale when possible
+        img.draft('L', target)
+        if img.mode in EIGHT_BIT_MODES:
+            img = img.convert('L')
+            img.thumbnail(target, Image.LANCZOS)
+        else:
+            img = _stretch_to_8bit(_downsample(img, working_resolution))
+    except (OSError, ValueError):
+        raise InvalidImageError('Image data is corrupt or truncated')
+
+    return img.tobytes(), img.width, img.height
+
+
+def _downsample(img, working_resolution):
+    """Resize a high bit-depth image to fit working_resolution, keeping its depth"""
+    scale = min(1.0, working_resolution / max(img.size))
+    size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+
+    if img.mode.startswith('I;16'):
+        # Resample in native 16-bit where Pillow supports it, so the only
+        # full-resolution buffer is the decoded image itself
+        try:
+            return img.resize(size, Image.LANCZOS)
+        except ValueError:
+            img = img.convert('I')
+    elif img.mode not in ('I', 'F'):
+        img = img.convert('I')
+    return img.resize(size, Image.LANCZOS)
+
+
+def _stretch_to_8bit(img):
+    """Convert to 8-bit grayscale, stretching the value range to 0-255"""
+    # A plain convert('L') would clip everything above 255 (e.g. 16-bit TIFF)
+    if img.mode != 'F':
+        img = img.convert('I')
+    low, high = img.getextrema()
+    if high <= low:
+        return Image.new('L', img.size, 0)
+    scale = 255.0 / (high - low)
+    # The +0.5 rounds to nearest so the maximum maps to 255, not 254
+    offset = 0.5 - low * scale
+    return img.point(lambda value: value * scale + offset).convert('L')
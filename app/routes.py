@@ -2,10 +2,13 @@ from flask import render_template, request, redirect, url_for, flash, jsonify
 from app import app
 from functools import wraps
 from werkzeug.utils import secure_filename
+from werkzeug.exceptions import RequestEntityTooLarge
+from app.imaging import normalize_image, InvalidImageError
 import requests
 import os
 import requests
 import os
+import time
 
 # Allowed file extensions for medical images
 allowed_extensions = {'png', 'jpg', 'jpeg', 'bmp', 'tiff'}
@@ -13,6 +16,29 @@ allowed_extensions = {'png', 'jpg', 'jpeg', 'bmp', 'tiff'}
 # ML Service configuration - support for containerized deployment
 ML_SERVICE_URL = os.environ.get('ML_SERVICE_URL', 'http://localhost:5002')
 
+# Analysis priority classes and how long the caller waits for each (seconds).
+# The remaining budget is forwarded to the ML service so it can drop work
+# whose caller has already given up.
+PRIORITY_TIMEOUTS = {
+    'stat': float(os.environ.get('ML_STAT_TIMEOUT', '15')),
+    'routine': float(os.environ.get('ML_ROUTINE_TIMEOUT', '30')),
+}
+DEFAULT_PRIORITY = 'routine'
+
+# Edge-side normalization: downsample and convert uploads to an 8-bit grayscale
+# buffer before sending them to the ML service's /predict_raw endpoint
+EDGE_NORMALIZE = os.environ.get('EDGE_NORMALIZE', 'false').lower() in ('1', 'true', 'yes')
+EDGE_WORKING_RESOLUTION = int(os.environ.get('EDGE_WORKING_RESOLUTION', '512'))
+
+# Largest side the ML service accepts on /predict_raw (same variable it reads)
+ML_MAX_RAW_DIMENSION = int(os.environ.get('ML_MAX_RAW_DIMENSION', '2048'))
+if EDGE_WORKING_RESOLUTION > ML_MAX_RAW_DIMENSION:
+    app.logger.warning(
+        f"EDGE_WORKING_RESOLUTION={EDGE_WORKING_RESOLUTION} exceeds the ML service limit; "
+        f"clamping to ML_MAX_RAW_DIMENSION={ML_MAX_RAW_DIMENSION}"
+    )
+    EDGE_WORKING_RESOLUTION = ML_MAX_RAW_DIMENSION
+
 @app.route('/health')
 def health_check():
     """Health check endpoint for container orchestration"""
@@ -22,6 +48,15 @@ def health_check():
         'ml_service_url': ML_SERVICE_URL
     }), 200
 
+@app.errorhandler(RequestEntityTooLarge)
+def upload_too_large(error):
+    """Reject uploads above MAX_CONTENT_LENGTH before they are read"""
+    limit_mb = app.config['MAX_CONTENT_LENGTH'] // (1024 * 1024)
+    return jsonify({
+        'error': f'File too large. Maximum upload size is {limit_mb}MB.',
+        'status': 'error'
+    }), 413
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -78,6 +113,8 @@ def upload_xray():
     Handle uploaded medical images and send to ML service for analysis
     Handle uploaded medical images and send to ML service for analysis
     """
+    started = time.monotonic()
+
     # Check if the 'file' key exists in the request.files dictionary
     if 'file' not in request.files:
         return jsonify({'error': 'No medical image uploaded', 'status': 'error'})
@@ -104,6 +141,10 @@ def upload_xray():
     patient_gender = request.form.get('patient_gender', '')
     study_type = request.form.get('study_type', '')
     clinical_notes = request.form.get('clinical_notes', '')
+    priority = request.form.get('priority', DEFAULT_PRIORITY).strip().lower()
+    if priority not in PRIORITY_TIMEOUTS:
+        priority = DEFAULT_PRIORITY
+    timeout = PRIORITY_TIMEOUTS[priority]
 
     # Validate file extension
     filename = secure_filename(file.filename).lower()
@@ -113,10 +154,33 @@ def upload_xray():
     try:
         # Prepare file for ML service
         file.seek(0)  # Reset file pointer
-        files = {'file': (file.filename, file.stream, file.content_type)}
+        data = {'priority': priority}
+
+        if EDGE_NORMALIZE:
+            # Send a compact grayscale buffer instead of the original upload
+            try:
+                pixels, width, height = normalize_image(file.stream, EDGE_WORKING_RESOLUTION)
+            except InvalidImageError as e:
+                return jsonify({'error': f'Invalid medical image: {e}', 'status': 'error'})
+            files = {'pixels': ('pixels.raw', pixels, 'application/octet-stream')}
+            data.update({'width': width, 'height': height, 'filename': filename})
+            endpoint = 'predict_raw'
+        else:
+            files = {'file': (file.filename, file.stream, file.content_type)}
+            endpoint = 'predict'
+        
+        # Forward only the budget left after time already spent in this handler
+        remaining = timeout - (time.monotonic() - started)
+        if remaining <= 0:
+            raise requests.exceptions.Timeout()
+        headers = {
+            'X-Priority': priority,
+            'X-Request-Budget-Ms': str(int(remaining * 1000)),
+        }
         
         # Send file to ML service
-        ml_response = requests.post(f'{ML_SERVICE_URL}/predict', files=files, timeout=30)
+        ml_response = requests.post(f'{ML_SERVICE_URL}/{endpoint}', files=files,
+                                    data=data, headers=headers, timeout=remaining)
         
         if ml_response.status_code == 200:
             ml_data = ml_response.json()
@@ -130,6 +194,7 @@ def upload_xray():
                 'patient_gender': patient_gender,
                 'study_type': study_type,
                 'clinical_notes': clinical_notes,
+                'priority': priority,
                 'filename': filename,
                 'prediction': ml_data.get('prediction', 'No prediction available'),
                 'confidence': ml_data.get('confidence', 0),
@@ -138,6 +203,27 @@ def upload_xray():
             }
             
             return jsonify(response_data)
+
+        elif ml_response.status_code in (429, 503):
+            # ML service shed the request; pass the back-pressure on to the client
+            retry_after = ml_response.headers.get('Retry-After', '5')
+            app.logger.warning(f"ML service overloaded ({ml_response.status_code}) for {priority} request")
+            return jsonify({
+                'error': 'Analysis service is busy',
+                'status': 'error',
+                'priority': priority,
+                'retry_after': retry_after,
+                'fallback_message': f'Please retry in {retry_after} seconds'
+            }), ml_response.status_code, {'Retry-After': retry_after}
+
+        elif ml_response.status_code == 504:
+            app.logger.error(f"ML service dropped {priority} request past its deadline")
+            return jsonify({
+                'error': 'Analysis request timed out',
+                'status': 'error',
+                'priority': priority,
+                'fallback_message': 'Image analysis is taking longer than expected'
+            }), 504
             
         else:
             # ML service error
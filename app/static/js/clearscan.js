@@ -133,6 +133,17 @@ document.addEventListener('DOMContentLoaded', function () {
             })
                 .then(response => {
                     if (!response.ok) {
+                        // Surface the server's message (e.g. 413 upload too large,
+                        // 429/503 retry hint) when the error body is JSON
+                        const contentType = response.headers.get('Content-Type') || '';
+                        if (contentType.includes('application/json')) {
+                            return response.json().then(data => {
+                                const serverError = new Error([data.error, data.fallback_message].filter(Boolean).join('. ')
+                                    || `HTTP error! status: ${response.status}`);
+                                serverError.fromServer = true;
+                                throw serverError;
+                            });
+                        }
                         throw new Error(`HTTP error! status: ${response.status}`);
                     }
                     return response.json();
@@ -148,7 +159,7 @@ document.addEventListener('DOMContentLoaded', function () {
                 })
                 .catch(error => {
                     console.error('Analysis error:', error);
-                    showError(`Network error: ${error.message}`);
+                    showError(error.fromServer ? error.message : `Network error: ${error.message}`);
                 })
                 .finally(() => {
                     if (submitBtn) {
@@ -1,38 +1,47 @@
 import os
 from flask import Flask, request, jsonify, send_file
-from scripts.gradcam_backend import process_image
+from PIL import Image
+from werkzeug.utils import secure_filename
+from scripts.gradcam_backend import process_image, process_pil_image
+from scripts.admission import (
+    AdmissionController, Rejected, RETRY_AFTER, cannot_finish, parse_deadline,
+    parse_priority
+)
 
 app = Flask(__name__)
 
 UPLOAD_FOLDER = "uploads"
 GRADCAM_FOLDER = "gradcams"
 
+# Largest side accepted on /predict_raw; the frontend downsamples before sending
+MAX_RAW_DIMENSION = int(os.environ.get("ML_MAX_RAW_DIMENSION", "2048"))
+
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(GRADCAM_FOLDER, exist_ok=True)
 
-@app.route("/health", methods=["GET"])
-def health_check():
-    """Health check endpoint for container orchestration"""
-    return jsonify({
-        "status": "healthy",
-        "service": "ml-service",
-        "timestamp": "ready"
-    }), 200
+admission = AdmissionController()
 
-@app.route("/predict", methods=["POST"])
-def predict():
-    if "file" not in request.files:
-        return jsonify({"error": "No file uploaded"}), 400
+def run_analysis(analyze):
+    """Run analyze() under admission control and build the prediction response"""
+    priority = parse_priority(request.form.get("priority") or request.headers.get("X-Priority"))
+    deadline = parse_deadline(request.headers.get("X-Request-Budget-Ms"))
 
-    file = request.files["file"]
-    if file.filename == '':
-        return jsonify({"error": "No file selected"}), 400
-        
-    img_path = os.path.join(UPLOAD_FOLDER, file.filename)
-    file.save(img_path)
+    # Drop work whose caller has given up or that can no longer finish in time
+    if cannot_finish(deadline, admission.inference_estimate):
+        return jsonify({"error": "Request deadline too close to complete analysis"}), 504
 
     try:
-        pred_label, confidence, gradcam_path = process_image(img_path)
+        admission.acquire(priority, deadline)
+    except Rejected as e:
+        response = jsonify({"error": e.message, "priority": priority})
+        response.headers["Retry-After"] = str(RETRY_AFTER)
+        return response, e.status
+
+    try:
+        if cannot_finish(deadline, admission.inference_estimate):
+            return jsonify({"error": "Request deadline exceeded while queued"}), 504
+
+        pred_label, confidence, gradcam_path = analyze()
 
         # Handle invalid input detection
         if pred_label == "INVALID_INPUT":
@@ -50,10 +59,68 @@ def predict():
         })
     except Exception as e:
         return jsonify({"error": f"Processing failed: {str(e)}"}), 500
+    finally:
+        admission.release()
+
+@app.route("/health", methods=["GET"])
+def health_check():
+    """Health check endpoint for container orchestration"""
+    return jsonify({
+        "status": "healthy",
+        "service": "ml-service",
+        "timestamp": "ready",
+        "admission": admission.snapshot()
+    }), 200
+
+@app.route("/predict", methods=["POST"])
+def predict():
+    if "file" not in request.files:
+        return jsonify({"error": "No file uploaded"}), 400
+
+    file = request.files["file"]
+    if file.filename == '':
+        return jsonify({"error": "No file selected"}), 400
+
+    def analyze():
+        img_path = os.path.join(UPLOAD_FOLDER, file.filename)
+        file.save(img_path)
+        return process_image(img_path)
+
+    return run_analysis(analyze)
+
+@app.route("/predict_raw", methods=["POST"])
+def predict_raw():
+    """
+    Analyze a frontend-normalized image: an 8-bit grayscale pixel buffer
+    with its width and height, so no image decoding is needed here.
+    """
+    if "pixels" not in request.files:
+        return jsonify({"error": "No pixel buffer uploaded"}), 400
+
+    try:
+        width = int(request.form.get("width", ""))
+        height = int(request.form.get("height", ""))
+    except ValueError:
+        return jsonify({"error": "Invalid image dimensions"}), 400
+
+    if not (0 < width <= MAX_RAW_DIMENSION and 0 < height <= MAX_RAW_DIMENSION):
+        return jsonify({"error": "Invalid image dimensions"}), 400
+
+    pixels = request.files["pixels"].read()
+    if len(pixels) != width * height:
+        return jsonify({"error": "Pixel buffer does not match image dimensions"}), 400
+
+    name = secure_filename(request.form.get("filename", "")) or "upload"
+
+    def analyze():
+        img = Image.frombytes("L", (width, height), pixels)
+        return process_pil_image(img, name)
+
+    return run_analysis(analyze)
 
 @app.route("/gradcam/<filename>")
 def serve_gradcam(filename):
     return send_file(os.path.join(GRADCAM_FOLDER, filename), mimetype="image/png")
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5002, debug=True)
\ No newline at end of file
+    app.run(host="0.0.0.0", port=5002, debug=True)
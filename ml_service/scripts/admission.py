@@ -0,0 +1,131 @@
+import os
+import threading
+import time
+from collections import deque
+
+# Priority classes accepted from callers. STAT studies may use every slot and
+# are always dequeued before routine studies; routine studies additionally
+# leave STAT_RESERVED_SLOTS free for urgent work.
+PRIORITY_STAT = "stat"
+PRIORITY_ROUTINE = "routine"
+PRIORITIES = (PRIORITY_STAT, PRIORITY_ROUTINE)
+
+# The model and GradCAM extractor are shared module state, so one inference
+# per worker is the safe default; scale out with more worker processes.
+MAX_INFLIGHT = int(os.environ.get("ML_MAX_INFLIGHT", "1"))
+STAT_RESERVED_SLOTS = int(os.environ.get("ML_STAT_RESERVED_SLOTS", "0"))
+MAX_QUEUE = {
+    PRIORITY_STAT: int(os.environ.get("ML_MAX_STAT_QUEUE", "8")),
+    PRIORITY_ROUTINE: int(os.environ.get("ML_MAX_ROUTINE_QUEUE", "4")),
+}
+# Longest time a request waits for a slot when the caller sent no deadline
+MAX_QUEUE_WAIT = float(os.environ.get("ML_MAX_QUEUE_WAIT", "10"))
+# Expected duration (seconds) of one DenseNet + GradCAM pass; requests whose
+# remaining budget is shorter are dropped instead of occupying a slot
+INFERENCE_ESTIMATE = float(os.environ.get("ML_INFERENCE_ESTIMATE", "2"))
+# Retry-After hint (seconds) returned with 429/503 responses
+RETRY_AFTER = int(os.environ.get("ML_RETRY_AFTER", "5"))
+
+
+class Rejected(Exception):
+    """Raised when a request cannot be admitted; carries the HTTP status to return."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def parse_priority(value):
+    value = (value or "").strip().lower()
+    return value if value in PRIORITIES else PRIORITY_ROUTINE
+
+
+def parse_deadline(header_value):
+    """Convert a remaining-budget header (milliseconds) into a local monotonic deadline."""
+    if not header_value:
+        return None
+    try:
+        budget_ms = float(header_value)
+    except ValueError:
+        return None
+    return time.monotonic() + budget_ms / 1000.0
+
+
+def cannot_finish(deadline, estimate=INFERENCE_ESTIMATE):
+    """True when the remaining budget is too short to complete an inference."""
+    return deadline is not None and deadline - time.monotonic() < estimate
+
+
+class AdmissionController:
+    def __init__(self, max_inflight=MAX_INFLIGHT, stat_reserved=STAT_RESERVED_SLOTS,
+                 max_queue=MAX_QUEUE, max_wait=MAX_QUEUE_WAIT,
+                 inference_estimate=INFERENCE_ESTIMATE):
+        self.max_inflight = max(1, max_inflight)
+        self.stat_reserved = min(max(0, stat_reserved), self.max_inflight - 1)
+        self.max_queue = dict(max_queue)
+        self.max_wait = max_wait
+        self.inference_estimate = inference_estimate
+        self.in_flight = 0
+        # FIFO of waiter tickets per priority; only the head of a queue may start
+        self._queues = {priority: deque() for priority in PRIORITIES}
+        self._cond = threading.Condition()
+
+    def _limit(self, priority):
+        if priority == PRIORITY_STAT:
+            return self.max_inflight
+        return self.max_inflight - self.stat_reserved
+
+    def _can_start(self, priority, ticket=None):
+        if self.in_flight >= self._limit(priority):
+            return False
+        # Routine work never overtakes STAT work that is already queued
+        if priority != PRIORITY_STAT and self._queues[PRIORITY_STAT]:
+            return False
+        # Within a class, requests start in arrival order
+        queue = self._queues[priority]
+        return not queue if ticket is None else queue[0] is ticket
+
+    def acquire(self, priority, deadline=None):
+        """Block until a slot is free for this priority, or raise Rejected."""
+        with self._cond:
+            if self._can_start(priority):
+                self.in_flight += 1
+                return
+
+            queue = self._queues[priority]
+            if len(queue) >= self.max_queue.get(priority, 0):
+                raise Rejected(429, f"Too many queued {priority} requests")
+
+            wait_until = time.monotonic() + self.max_wait
+            if deadline is not None:
+                # Stop waiting once the request could no longer finish in time
+                wait_until = min(wait_until, deadline - self.inference_estimate)
+
+            ticket = object()
+            queue.append(ticket)
+            try:
+                while not self._can_start(priority, ticket):
+                    remaining = wait_until - time.monotonic()
+                    if remaining <= 0:
+                        raise Rejected(503, "Analysis service is at capacity")
+                    self._cond.wait(remaining)
+                self.in_flight += 1
+            finally:
+                queue.remove(ticket)
+                # A departing waiter may unblock the next one in line
+                self._cond.notify_all()
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def snapshot(self):
+        with self._cond:
+            return {
+                "in_flight": self.in_flight,
+                "max_inflight": self.max_inflight,
+                "stat_reserved": self.stat_reserved,
+                "waiting": {priority: len(queue) for priority, queue in self._queues.items()},
+            }
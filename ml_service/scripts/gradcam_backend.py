@@ -29,8 +29,13 @@ model.eval()
 cam_extractor = GradCAM(model, target_layer='features.norm5')
 
 def process_image(img_path):
-    # Load and preprocess image
-    img = Image.open(img_path).convert('RGB')
+    # Load image from disk
+    img = Image.open(img_path)
+    return process_pil_image(img, os.path.basename(img_path))
+
+def process_pil_image(img, name):
+    # Preprocess an already-decoded image (e.g. a normalized buffer from the frontend)
+    img = img.convert('RGB')
     input_tensor = transform(img).unsqueeze(0).to(DEVICE)
     input_tensor.requires_grad_(True)
     
@@ -58,7 +63,7 @@ def process_image(img_path):
     gradcam_dir = "gradcams"
     os.makedirs(gradcam_dir, exist_ok=True)
     gradcam_path = os.path.join(
-        gradcam_dir, os.path.basename(img_path) + "_gradcam.png"
+        gradcam_dir, name + "_gradcam.png"
     )
     result.save(gradcam_path)
     
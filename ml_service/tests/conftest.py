@@ -0,0 +1,35 @@
+import importlib.util
+import os
+import sys
+import types
+
+import pytest
+
+SERVICE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Make the service's "scripts" package importable when running pytest from any
+# directory. Appended so the frontend's "app" package keeps precedence over
+# the service's app.py when both test suites run together.
+if SERVICE_DIR not in sys.path:
+    sys.path.append(SERVICE_DIR)
+
+
+def _not_stubbed(*args, **kwargs):
+    raise AssertionError("inference should be stubbed by the test")
+
+
+@pytest.fixture
+def ml_app(monkeypatch, tmp_path):
+    """The ML service module, loaded without torch or model weights"""
+    # gradcam_backend loads DenseNet weights at import; replace it with a stub
+    backend = types.ModuleType("scripts.gradcam_backend")
+    backend.process_image = _not_stubbed
+    backend.process_pil_image = _not_stubbed
+    monkeypatch.setitem(sys.modules, "scripts.gradcam_backend", backend)
+
+    # app.py creates its upload folders relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    spec = importlib.util.spec_from_file_location("ml_app", os.path.join(SERVICE_DIR, "app.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
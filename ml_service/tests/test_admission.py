@@ -0,0 +1,149 @@
+import threading
+import time
+
+import pytest
+
+from scripts.admission import (
+    PRIORITY_ROUTINE, PRIORITY_STAT, AdmissionController, Rejected, cannot_finish
+)
+
+
+def make_controller(**overrides):
+    options = dict(
+        max_inflight=1,
+        stat_reserved=0,
+        max_queue={PRIORITY_STAT: 1, PRIORITY_ROUTINE: 1},
+        max_wait=2,
+        inference_estimate=0,
+    )
+    options.update(overrides)
+    return AdmissionController(**options)
+
+
+def wait_for_waiters(controller, priority, count, timeout=2):
+    end = time.monotonic() + timeout
+    while controller.snapshot()["waiting"][priority] < count:
+        assert time.monotonic() < end, "waiter never queued"
+        time.sleep(0.01)
+
+
+def start_worker(controller, priority, results, label=None):
+    label = label or priority
+
+    def run():
+        try:
+            controller.acquire(priority)
+        except Rejected as e:
+            results.append((label, e.status))
+            return
+        results.append(label)
+        controller.release()
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def test_stat_jumps_ahead_of_queued_routine():
+    controller = make_controller()
+    controller.acquire(PRIORITY_ROUTINE)
+    results = []
+
+    routine = start_worker(controller, PRIORITY_ROUTINE, results)
+    wait_for_waiters(controller, PRIORITY_ROUTINE, 1)
+    stat = start_worker(controller, PRIORITY_STAT, results)
+    wait_for_waiters(controller, PRIORITY_STAT, 1)
+
+    controller.release()
+    routine.join()
+    stat.join()
+
+    assert results == [PRIORITY_STAT, PRIORITY_ROUTINE]
+
+
+@pytest.mark.parametrize("priority", [PRIORITY_STAT, PRIORITY_ROUTINE])
+def test_queued_waiter_served_before_later_arrival(priority):
+    controller = make_controller(max_queue={PRIORITY_STAT: 2, PRIORITY_ROUTINE: 2})
+    controller.acquire(priority)
+    results = []
+
+    queued = start_worker(controller, priority, results, label="queued")
+    wait_for_waiters(controller, priority, 1)
+
+    # Free the slot and arrive again before the queued waiter has woken up
+    controller.release()
+    controller.acquire(priority)
+    results.append("later")
+    controller.release()
+    queued.join()
+
+    assert results == ["queued", "later"]
+
+
+def test_full_queue_rejects_with_429():
+    controller = make_controller()
+    controller.acquire(PRIORITY_ROUTINE)
+    results = []
+
+    queued = start_worker(controller, PRIORITY_ROUTINE, results)
+    wait_for_waiters(controller, PRIORITY_ROUTINE, 1)
+
+    with pytest.raises(Rejected) as excinfo:
+        controller.acquire(PRIORITY_ROUTINE)
+    assert excinfo.value.status == 429
+
+    controller.release()
+    queued.join()
+    assert results == [PRIORITY_ROUTINE]
+
+
+def test_wait_past_deadline_rejects_with_503():
+    controller = make_controller()
+    controller.acquire(PRIORITY_STAT)
+
+    with pytest.raises(Rejected) as excinfo:
+        controller.acquire(PRIORITY_STAT, deadline=time.monotonic() + 0.05)
+    assert excinfo.value.status == 503
+
+    controller.release()
+
+
+def test_wait_stops_when_inference_cannot_finish():
+    controller = make_controller(inference_estimate=5)
+    controller.acquire(PRIORITY_STAT)
+
+    started = time.monotonic()
+    with pytest.raises(Rejected) as excinfo:
+        controller.acquire(PRIORITY_STAT, deadline=started + 1)
+    assert excinfo.value.status == 503
+    assert time.monotonic() - started < 0.5
+
+    controller.release()
+
+
+def test_counters_return_to_zero():
+    controller = make_controller(max_queue={PRIORITY_STAT: 4, PRIORITY_ROUTINE: 4})
+    controller.acquire(PRIORITY_ROUTINE)
+    results = []
+
+    workers = [
+        start_worker(controller, priority, results)
+        for priority in (PRIORITY_ROUTINE, PRIORITY_STAT, PRIORITY_ROUTINE, PRIORITY_STAT)
+    ]
+    wait_for_waiters(controller, PRIORITY_STAT, 2)
+    wait_for_waiters(controller, PRIORITY_ROUTINE, 2)
+
+    controller.release()
+    for worker in workers:
+        worker.join()
+
+    assert sorted(results) == sorted([PRIORITY_ROUTINE, PRIORITY_STAT] * 2)
+    assert controller.snapshot()["in_flight"] == 0
+    assert controller.snapshot()["waiting"] == {PRIORITY_STAT: 0, PRIORITY_ROUTINE: 0}
+
+
+def test_cannot_finish():
+    now = time.monotonic()
+    assert not cannot_finish(None, estimate=2)
+    assert cannot_finish(now + 1, estimate=2)
+    assert not cannot_finish(now + 5, estimate=2)
@@ -0,0 +1,132 @@
+import io
+
+import pytest
+
+from scripts.admission import PRIORITY_ROUTINE, PRIORITY_STAT, AdmissionController
+
+
+def make_controller(**overrides):
+    options = dict(
+        max_inflight=1,
+        stat_reserved=0,
+        max_queue={PRIORITY_STAT: 0, PRIORITY_ROUTINE: 0},
+        max_wait=0.05,
+        inference_estimate=2,
+    )
+    options.update(overrides)
+    return AdmissionController(**options)
+
+
+def post_image(client, headers=None, priority=None):
+    data = {"file": (io.BytesIO(b"image"), "scan.png")}
+    if priority:
+        data["priority"] = priority
+    return client.post("/predict", data=data, headers=headers or {},
+                       content_type="multipart/form-data")
+
+
+def test_predict_runs_analysis(ml_app, monkeypatch):
+    monkeypatch.setattr(ml_app, "admission", make_controller())
+    monkeypatch.setattr(ml_app, "process_image",
+                        lambda path: ("normal", 0.9, "gradcams/scan.png_gradcam.png"))
+
+    response = post_image(ml_app.app.test_client())
+
+    assert response.status_code == 200
+    assert response.json["prediction"] == "normal"
+    assert response.json["gradcam_image_url"] == "/gradcam/scan.png_gradcam.png"
+
+
+def test_budget_shorter_than_inference_is_dropped_before_queueing(ml_app, monkeypatch):
+    admission = make_controller()
+    monkeypatch.setattr(ml_app, "admission", admission)
+
+    response = post_image(ml_app.app.test_client(), headers={"X-Request-Budget-Ms": "100"})
+
+    assert response.status_code == 504
+    assert admission.snapshot()["in_flight"] == 0
+
+
+def test_rejected_request_returns_status_and_retry_after(ml_app, monkeypatch):
+    admission = make_controller()
+    admission.acquire(PRIORITY_STAT)
+    monkeypatch.setattr(ml_app, "admission", admission)
+
+    response = post_image(ml_app.app.test_client(), priority="stat")
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == str(ml_app.RETRY_AFTER)
+    assert response.json["priority"] == PRIORITY_STAT
+
+
+def test_slot_released_when_analysis_fails(ml_app, monkeypatch):
+    admission = make_controller()
+    monkeypatch.setattr(ml_app, "admission", admission)
+
+    def fail(path):
+        raise RuntimeError("model exploded")
+
+    monkeypatch.setattr(ml_app, "process_image", fail)
+
+    response = post_image(ml_app.app.test_client())
+
+    assert response.status_code == 500
+    assert "model exploded" in response.json["error"]
+    assert admission.snapshot()["in_flight"] == 0
+
+
+def post_raw(client, width, height, pixels, filename="scan.tiff"):
+    data = {
+        "pixels": (io.BytesIO(pixels), "pixels.raw"),
+        "width": str(width),
+        "height": str(height),
+        "filename": filename,
+    }
+    return client.post("/predict_raw", data=data, content_type="multipart/form-data")
+
+
+def test_predict_raw_builds_grayscale_image(ml_app, monkeypatch):
+    monkeypatch.setattr(ml_app, "admission", make_controller())
+    seen = {}
+
+    def fake_process(img, name):
+        seen.update(mode=img.mode, size=img.size, name=name, pixels=img.tobytes())
+        return "tb", 0.8, f"gradcams/{name}_gradcam.png"
+
+    monkeypatch.setattr(ml_app, "process_pil_image", fake_process)
+
+    response = post_raw(ml_app.app.test_client(), 3, 2, bytes(range(6)), filename="../scan.tiff")
+
+    assert response.status_code == 200
+    assert response.json["prediction"] == "tb"
+    assert seen == {"mode": "L", "size": (3, 2), "name": "scan.tiff", "pixels": bytes(range(6))}
+
+
+@pytest.mark.parametrize("width, height", [("abc", "2"), ("3", ""), ("0", "2"), ("3", "-1")])
+def test_predict_raw_rejects_bad_dimensions(ml_app, width, height):
+    response = post_raw(ml_app.app.test_client(), width, height, bytes(6))
+
+    assert response.status_code == 400
+    assert response.json["error"] == "Invalid image dimensions"
+
+
+def test_predict_raw_rejects_dimensions_over_limit(ml_app):
+    too_wide = ml_app.MAX_RAW_DIMENSION + 1
+
+    response = post_raw(ml_app.app.test_client(), too_wide, 1, bytes(too_wide))
+
+    assert response.status_code == 400
+    assert response.json["error"] == "Invalid image dimensions"
+
+
+def test_predict_raw_rejects_mismatched_buffer(ml_app):
+    response = post_raw(ml_app.app.test_client(), 3, 2, bytes(5))
+
+    assert response.status_code == 400
+    assert "does not match" in response.json["error"]
+
+
+def test_predict_raw_requires_pixels(ml_app):
+    response = ml_app.app.test_client().post("/predict_raw", data={"width": "1", "height": "1"})
+
+    assert response.status_code == 400
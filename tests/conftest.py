@@ -0,0 +1,14 @@
+import os
+import sys
+
+import pytest
+
+# Make the frontend "app" package importable when running pytest from any directory
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+@pytest.fixture
+def client():
+    from app import app
+    app.config['TESTING'] = True
+    return app.test_client()
@@ -0,0 +1,116 @@
+import io
+
+import pytest
+from PIL import Image
+
+from app import imaging
+from app.imaging import InvalidImageError, normalize_image
+
+
+def encode(img, fmt):
+    buffer = io.BytesIO()
+    img.save(buffer, fmt)
+    buffer.seek(0)
+    return buffer
+
+
+def gradient(mode, size, high):
+    img = Image.new(mode, size)
+    width, height = size
+    img.putdata([(x + y) * high // (width + height - 2) for y in range(height) for x in range(width)])
+    return img
+
+
+@pytest.mark.parametrize('fmt', ['PNG', 'JPEG', 'BMP', 'TIFF'])
+def test_allowed_formats_become_8bit_grayscale(fmt):
+    img = Image.new('RGB', (1000, 500), (200, 200, 200))
+
+    pixels, width, height = normalize_image(encode(img, fmt), 512)
+
+    assert (width, height) == (512, 256)
+    assert len(pixels) == width * height
+
+
+def test_small_image_is_not_upscaled():
+    pixels, width, height = normalize_image(encode(Image.new('L', (100, 80)), 'PNG'), 512)
+
+    assert (width, height) == (100, 80)
+
+
+def test_format_is_checked_from_header_not_extension():
+    with pytest.raises(InvalidImageError, match='GIF'):
+        normalize_image(encode(Image.new('L', (10, 10)), 'GIF'), 512)
+
+
+def test_non_image_is_rejected():
+    with pytest.raises(InvalidImageError, match='not a readable image'):
+        normalize_image(io.BytesIO(b'not an image at all'), 512)
+
+
+def test_truncated_image_is_rejected():
+    data = encode(Image.effect_noise((400, 400), 64), 'PNG').getvalue()
+
+    with pytest.raises(InvalidImageError, match='corrupt or truncated'):
+        normalize_image(io.BytesIO(data[:len(data) // 2]), 512)
+
+
+def test_pixel_cap_is_enforced(monkeypatch):
+    monkeypatch.setattr(imaging, 'MAX_IMAGE_PIXELS', 99)
+
+    with pytest.raises(InvalidImageError, match='out of range'):
+        normalize_image(encode(Image.new('L', (10, 10)), 'PNG'), 512)
+
+
+def test_16bit_image_is_stretched_to_full_range():
+    img = gradient('I;16', (3000, 2000), 40000)
+
+    pixels, width, height = normalize_image(encode(img, 'TIFF'), 512)
+
+    assert (width, height) == (512, 341)
+    assert min(pixels) == 0
+    assert max(pixels) == 255
+
+
+def test_stretch_rounds_maximum_to_255():
+    img = Image.new('I;16', (2, 1))
+    img.putdata([1000, 1003])
+
+    pixels, _, _ = normalize_image(encode(img, 'TIFF'), 512)
+
+    # A truncating stretch maps the maximum to 254
+    assert list(pixels) == [0, 255]
+
+
+def test_16bit_falls_back_to_32bit_when_native_resize_unsupported(monkeypatch):
+    original_resize = Image.Image.resize
+    modes = []
+
+    def resize(self, size, *args, **kwargs):
+        modes.append(self.mode)
+        if self.mode.startswith('I;16'):
+            raise ValueError('image has wrong mode')
+        return original_resize(self, size, *args, **kwargs)
+
+    monkeypatch.setattr(Image.Image, 'resize', resize)
+
+    pixels, width, height = normalize_image(encode(gradient('I;16', (1024, 1024), 60000), 'TIFF'), 256)
+
+    assert modes == ['I;16', 'I']
+    assert (width, height) == (256, 256)
+    assert max(pixels) == 255
+
+
+def test_float_image_is_stretched():
+    img = Image.new('F', (20, 10), 3.0)
+    img.putpixel((0, 0), 10.0)
+
+    pixels, _, _ = normalize_image(encode(img, 'TIFF'), 512)
+
+    assert max(pixels) == 255
+    assert min(pixels) == 0
+
+
+def test_constant_high_bit_depth_image_is_black():
+    pixels, _, _ = normalize_image(encode(Image.new('I;16', (10, 10), 500), 'TIFF'), 512)
+
+    assert set(pixels) == {0}
@@ -0,0 +1,88 @@
+import io
+
+import pytest
+import requests
+
+from app import routes
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=None, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self._body = body or {}
+        self.text = str(self._body)
+
+    def json(self):
+        return self._body
+
+
+def stub_ml_service(monkeypatch, response):
+    calls = []
+
+    def fake_post(url, **kwargs):
+        calls.append((url, kwargs))
+        return response
+
+    monkeypatch.setattr(routes.requests, 'post', fake_post)
+    return calls
+
+
+def upload(client, priority='routine'):
+    data = {'file': (io.BytesIO(b'image'), 'scan.png'), 'priority': priority}
+    return client.post('/process', data=data, content_type='multipart/form-data')
+
+
+def test_forwards_priority_and_remaining_budget(client, monkeypatch):
+    calls = stub_ml_service(monkeypatch, FakeResponse(200, {'prediction': 'normal', 'confidence': 0.9}))
+
+    response = upload(client, priority='stat')
+
+    assert response.status_code == 200
+    assert response.json['priority'] == 'stat'
+    url, kwargs = calls[0]
+    assert url.endswith('/predict')
+    assert kwargs['headers']['X-Priority'] == 'stat'
+    budget_ms = int(kwargs['headers']['X-Request-Budget-Ms'])
+    assert 0 < budget_ms <= routes.PRIORITY_TIMEOUTS['stat'] * 1000
+    assert kwargs['timeout'] <= routes.PRIORITY_TIMEOUTS['stat']
+
+
+@pytest.mark.parametrize('status', [429, 503])
+def test_overload_passes_through_with_retry_after(client, monkeypatch, status):
+    stub_ml_service(monkeypatch, FakeResponse(status, {'error': 'busy'}, {'Retry-After': '7'}))
+
+    response = upload(client, priority='stat')
+
+    assert response.status_code == status
+    assert response.headers['Retry-After'] == '7'
+    assert response.json['retry_after'] == '7'
+    assert response.json['priority'] == 'stat'
+
+
+def test_deadline_drop_returns_504(client, monkeypatch):
+    stub_ml_service(monkeypatch, FakeResponse(504, {'error': 'deadline'}))
+
+    response = upload(client)
+
+    assert response.status_code == 504
+    assert response.json['priority'] == 'routine'
+
+
+def test_unknown_priority_falls_back_to_routine(client, monkeypatch):
+    calls = stub_ml_service(monkeypatch, FakeResponse(200, {'prediction': 'normal'}))
+
+    upload(client, priority='whenever')
+
+    assert calls[0][1]['headers']['X-Priority'] == 'routine'
+
+
+def test_ml_timeout_reports_error(client, monkeypatch):
+    def fake_post(url, **kwargs):
+        raise requests.exceptions.Timeout()
+
+    monkeypatch.setattr(routes.requests, 'post', fake_post)
+
+    response = upload(client)
+
+    assert response.json['error'] == 'Analysis request timed out'